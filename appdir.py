@@ -1,10 +1,11 @@
 import os
 
 def is_appdir(path):
+    # Check the name first so that other paths do not cost any system calls;
+    # os.access fails for files that do not exist and for paths that are not directories,
+    # so separate os.path.isdir and os.path.exists checks are not needed
     return (
-        os.path.isdir(path)
-        and path.endswith(".AppDir")
-        and ( os.path.exists(os.path.join(path, "AppRun")) or os.path.exists(os.path.join(path, "AppRun.bat")))
+        path.endswith(".AppDir")
         and ( os.access(os.path.join(path, "AppRun"), os.X_OK) or os.access(os.path.join(path, "AppRun.bat"), os.X_OK))
     )
 
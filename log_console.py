@@ -1,7 +1,9 @@
 import sys
 import io
+import threading
 from PyQt6.QtWidgets import QMainWindow, QPlainTextEdit, QMessageBox
 from PyQt6.QtGui import QAction
+from PyQt6.QtCore import Qt, QTimer, QThread, QMetaObject
 
 """When running a GUI application, it is useful to have a log console
 since the standard output and standard error streams are not visible.
@@ -30,6 +32,15 @@ class ConsoleOutputStream(io.TextIOBase):
                 self.log_console.verticalScrollBar().maximum()))
         # Should the application ever crash, show the log console
         sys.excepthook = self.show_traceback
+        # Lines written in quick succession are collected and appended together,
+        # at most about 60 times per second, instead of updating the console for every single line
+        self.pending_lines = []
+        # Other threads can write too, e.g., PyQt prints the tracebacks of worker threads from those threads
+        self.pending_lines_lock = threading.Lock()
+        self.append_timer = QTimer()
+        self.append_timer.setSingleShot(True)
+        self.append_timer.setInterval(16)
+        self.append_timer.timeout.connect(self.append_pending_lines)
 
     def write(self, s):
         # Ignore whitespace
@@ -37,7 +48,31 @@ class ConsoleOutputStream(io.TextIOBase):
             return
         # Remove newline characters; does not seem to work
         s = s.rstrip()
-        self.log_console.appendHtml(s)
+        with self.pending_lines_lock:
+            self.pending_lines.append(s)
+        self.schedule_append()
+
+    def flush(self):
+        # Show the collected lines right away; other threads leave that to the GUI thread
+        if QThread.currentThread() == self.append_timer.thread():
+            self.append_pending_lines()
+        else:
+            self.schedule_append()
+
+    def schedule_append(self):
+        # A timer can only be started from its own thread, so other threads ask the GUI thread to start it
+        if QThread.currentThread() == self.append_timer.thread():
+            if not self.append_timer.isActive():
+                self.append_timer.start()
+        else:
+            QMetaObject.invokeMethod(self.append_timer, "start", Qt.ConnectionType.QueuedConnection)
+
+    def append_pending_lines(self):
+        with self.pending_lines_lock:
+            lines, self.pending_lines = self.pending_lines, []
+        if not lines:
+            return
+        self.log_console.appendHtml("<br>".join(lines))
 
     def add_menu_items(self, menu, parent):
         menu.addSeparator()
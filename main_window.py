@@ -25,17 +25,20 @@ class CustomFileSystemModel(QFileSystemModel):
     """
     Custom file system model that allows us to customize e.g., the icons being used.
     """
+    # The folder icon, looked up on first use; data() is called for every visible row on every repaint
+    dir_icon = None
+
     def data(self, index, role):
         if role == Qt.ItemDataRole.DecorationRole:
             if self.isDir(index):
-                return self.style().standardIcon(QStyle.StandardPixmap.SP_DirIcon)
+                if CustomFileSystemModel.dir_icon is None:
+                    CustomFileSystemModel.dir_icon = self.style().standardIcon(QStyle.StandardPixmap.SP_DirIcon)
+                return CustomFileSystemModel.dir_icon
         return super().data(index, role)
 
     def style(self):
-        # To access the style in the model, we need to create a temporary widget
-        # This is a workaround because models don't have a style method
-        from PyQt6.QtWidgets import QWidget
-        return QWidget().style()
+        # Models don't have a style method; all widgets use the application style unless one is set explicitly
+        return QApplication.style()
     
 
 class DragDropListView(QListView):
@@ -9,33 +9,60 @@ import json
 import subprocess
 import math
 import shutil
-
-from PyQt6.QtCore import Qt, QPoint, QSize, QDir, QRect, QMimeData, QUrl, QFileSystemWatcher, QFileInfo, QTimer, QRegularExpression, QObject, QEvent
-from PyQt6.QtGui import QFontMetrics, QPainter, QPen, QAction, QDrag, QColor, QPainter, QPen, QBrush, QPixmap, QKeySequence, QFont, QIcon, QShortcut, QRegularExpressionValidator, QCursor
+import stat
+import uuid
+import weakref
+import threading
+import contextlib
+import collections
+import functools
+import operator
+import time
+
+# Messages about events that happen many times, e.g., while dragging, are only printed when SPATIAL_DEBUG is set;
+# printing goes through the log console, which would be updated for each of them
+DEBUG = bool(os.environ.get("SPATIAL_DEBUG"))
+
+def debug_print(*args):
+    if DEBUG:
+        print(*args)
+
+try:
+    # Faster JSON encoding and decoding if available
+    import orjson
+except ImportError:
+    orjson = None
+
+from PyQt6.QtCore import Qt, QPoint, QSize, QDir, QRect, QMimeData, QUrl, QFileSystemWatcher, QFileInfo, QTimer, QRegularExpression, QObject, QEvent, QRunnable, QThreadPool, pyqtSignal, QDateTime, QMimeDatabase
+from PyQt6.QtGui import QFontMetrics, QPainter, QPen, QAction, QDrag, QColor, QPainter, QPen, QBrush, QPixmap, QKeySequence, QFont, QIcon, QShortcut, QRegularExpressionValidator, QCursor, QPixmapCache
 from PyQt6.QtWidgets import QApplication, QWidget, QVBoxLayout, QScrollArea, QLabel, QSizePolicy, QMainWindow, QDialogButtonBox
-from PyQt6.QtWidgets import QStatusBar, QComboBox, QFileIconProvider, QMenuBar, QGridLayout, QMessageBox, QMenu, QDialog, QLineEdit, QGraphicsScene, QGraphicsPixmapItem
+from PyQt6.QtWidgets import QStatusBar, QComboBox, QFileIconProvider, QMenuBar, QGridLayout, QMessageBox, QMenu, QDialog, QLineEdit
 
+# win32com and windows_context_menu are imported where they are first needed, importing them is slow
 if sys.platform == "win32":
-    from win32com.client import Dispatch
-    import windows_context_menu
     import windows_file_operations
 
 import appdir
 
+# Payloads of drags that started in this process, keyed by the value stored under SPATIAL_DRAG_MIME_TYPE in the mime data
+SPATIAL_DRAG_MIME_TYPE = "application/x-spatial-items"
+_drag_payloads = {}
+
 class SpatialFiler(QMainWindow):
 
     def __init__(self, path=None, is_desktop_window=False):
         super().__init__()
         
-        self.path = os.path.normpath(path) if path else QDir.homePath()
+        self.path = os.path.normpath(path or QDir.homePath())
         self.setWindowTitle(self.path)
         self.setGeometry(100, 100, 800, 600)
         self.is_desktop_window = is_desktop_window
+        # Whether this window shows the desktop directory, also when it is not the desktop window itself
+        self.is_desktop_directory = self.path == app.desktop_directory
         self.is_spring_opened = False
 
         # Set folder icon on window; unfortunately Windows doesn't use this for the taskbar icon
-        icon_provider = QFileIconProvider()
-        icon = icon_provider.icon(QFileInfo(self.path))
+        icon = app.icon_provider.icon(QFileInfo(self.path))
         self.setWindowIcon(icon)
 
         self.setAcceptDrops(True)
@@ -44,24 +71,20 @@ class SpatialFiler(QMainWindow):
         # Example file content:
         # {"position": {"x": 499, "y": 242}, "size": {"width": 800, "height": 600}, "items": [{"name": "known_hosts", "x": 110, "y": 0}, {"name": "known_hosts.old", "x": 220, "y": 0}]}
         settings_file = os.path.join(self.path, app.desktop_settings_file)
-        if os.path.exists(settings_file):
-            with open(settings_file, "r") as file:
-                try:
-                    settings = json.load(file)
-                    print("Settings from %s" % (settings_file))
-                    # Check if there is a position for the window in the settings file; if yes, set the window position
-                    if "position" in settings:
-                        self.move(settings["position"]["x"], settings["position"]["y"])
-                    # Check if there is a size for the window in the settings file; if yes, set the window size
-                    if "size" in settings:
-                        self.resize(settings["size"]["width"], settings["size"]["height"])
-                    # Check if the window is out of the screen; if yes, move it to the top-left corner
-                    if self.x() < 0 or self.y() < 0:
-                        self.move(0, 0)
-                except json.JSONDecodeError as e:
-                    print(f"Error reading settings file: {e}")
+        settings = load_settings(settings_file)
+        if settings is not None:
+            print("Settings from %s" % (settings_file))
+            # Check if there is a position for the window in the settings file; if yes, set the window position
+            if "position" in settings:
+                self.move(settings["position"]["x"], settings["position"]["y"])
+            # Check if there is a size for the window in the settings file; if yes, set the window size
+            if "size" in settings:
+                self.resize(settings["size"]["width"], settings["size"]["height"])
+            # Check if the window is out of the screen; if yes, move it to the top-left corner
+            if self.x() < 0 or self.y() < 0:
+                self.move(0, 0)
         else:
-            print(f"Settings file {settings_file} does not exist")
+            print(f"No settings read from {settings_file}")
 
         # Create the central widget
         self.central_widget = QWidget()
@@ -71,6 +94,9 @@ class SpatialFiler(QMainWindow):
         self.scroll_area.setContentsMargins(0, 0, 0, 0)
         self.scroll_area.setWidgetResizable(True)
         self.container = QWidget()
+        # The items are child widgets that keep their position when the window is resized,
+        # so only the newly exposed area needs to be repainted instead of every item
+        self.container.setAttribute(Qt.WidgetAttribute.WA_StaticContents)
         palette = self.container.palette()
         palette.setColor(self.container.backgroundRole(), Qt.GlobalColor.white)
         self.container.setPalette(palette)
@@ -86,18 +112,47 @@ class SpatialFiler(QMainWindow):
 
         # Initialize other components
         self.items = []
+        # Items by their normalized path for fast lookups, kept in sync with self.items
+        self._items_by_path = {}
+        # Width of the widest item, kept up to date as items are added so that placing an item does not look at all others
+        self._max_item_width = 0
+        # Right and bottom edges of the items, kept up to date as items are added and moved; None when they need to be recomputed
+        self._items_extent = None
+        # Number of items by name, for checking whether an item with a given name is shown without looking at all items
+        self._item_names = collections.Counter()
+        # Items whose icon or text label is highlighted, kept up to date by the items; a click only needs to unhighlight these
+        self.highlighted_items = set()
+        self.highlighted_text_items = set()
+        # Whether self.items is sorted by name; removing items keeps it sorted, only adding an item can change that
+        self._items_sorted = True
+        # Modification time of the directory when it was last listed, see list_directory
+        self.directory_mtime = None
+        # Whether populate_items is adding items; it updates the container size itself when it is done
+        self._populating = False
+        # Item positions from the .DS_Spatial file by file name, read once so that placing an item is a single lookup
+        self._saved_positions = {}
+        if settings is not None:
+            for item in settings.get("items", []):
+                self._saved_positions[item["name"].replace("$Recycle.Bin", app.trash_name)] = (item["x"], item["y"])
         self.vertical_spacing = 0
-        self.line_height = app.icon_size + QFontMetrics(self.font()).height() + 16
+        self.line_height = app.line_height
         self.horizontal_spacing = 0
         self.item_width_for_positioning = 150
+        # Uniform grid of cells, each listing the items that overlap it, so that hit-testing
+        # only needs to look at the items near a position instead of at all items
+        self._grid_cell_size = max(self.line_height, self.item_width_for_positioning)
+        self._grid = {}
         self.start_x = 0
         self.start_y = 0
         self.populate_items()
         self.dragging = False
         self.last_pos = QPoint(0, 0)
-        self.selected_files = []
+        # Selected items in the order they were selected; a dict is used as an ordered set so that membership tests are O(1)
+        self.selected_files = {}
         self.selection_rect = QRect(0, 0, 0, 0)
         self.is_selecting = False
+        # Mouse move events often arrive for the same position; remember the last one to skip them
+        self._last_move_pos = None
 
         # Setup status bar with a dropdown if this is not the desktop window
         if not self.is_desktop_window:
@@ -123,11 +178,20 @@ class SpatialFiler(QMainWindow):
         # To keep track of drag distances
         self.initial_position = None
 
-        # Watch for changes in the directory
-        self.file_watcher = QFileSystemWatcher()
-        self.file_watcher.directoryChanged.connect(self.directory_changed)
-        self.file_watcher.fileChanged.connect(self.file_changed)
-        self.file_watcher.addPath(self.path)
+        # For spring-loaded folders; only one item can be dragged over at a time, so all items of the window share one timer
+        self.spring_open_timer = QTimer(self)
+        self.spring_open_timer.setSingleShot(True)
+        self.spring_open_timer.setInterval(1500)
+        self.spring_open_timer.timeout.connect(self.spring_open_hovered_item)
+        self.hovered_item = None
+
+        # Watch for changes in the directory; bursts of changes, e.g., while files are being copied, cause only one rescan
+        self.rescan_timer = QTimer(self)
+        self.rescan_timer.setSingleShot(True)
+        self.rescan_timer.setInterval(150)
+        self.rescan_timer.timeout.connect(self.rescan_directory)
+        self.rescan_burst_start = 0
+        watch_directory(self)
 
         # To keep track of spring-loaded folders needing to be closed
         self.installEventFilter(self)
@@ -137,7 +201,7 @@ class SpatialFiler(QMainWindow):
         if event.type() == QEvent.Type.DragLeave:
             # Check whether mouse coordinates are inside or outside of the window, and print the result
             mouse_is_inside = self.rect().contains(self.mapFromGlobal(QCursor.pos()))
-            print("Mouse is inside:", mouse_is_inside)
+            debug_print("Mouse is inside:", mouse_is_inside)
             if not mouse_is_inside and self.is_spring_opened:
                 self.close()
             # Handle the drag leave event here
@@ -146,9 +210,9 @@ class SpatialFiler(QMainWindow):
 
     def keyPressEvent(self, event):
         # Handle Tab and Shift-Tab to select the next and previous item
-        if event.key() == Qt.Key.Key_Tab:
-            if QApplication.keyboardModifiers() == Qt.KeyboardModifier.ShiftModifier:
-                # FIXME: Why does this never get called?
+        # Shift-Tab arrives as Key_Backtab; the modifiers are taken from the event rather than queried from the application
+        if event.key() in (Qt.Key.Key_Tab, Qt.Key.Key_Backtab):
+            if event.key() == Qt.Key.Key_Backtab or event.modifiers() & Qt.KeyboardModifier.ShiftModifier:
                 self.select_previous_item()
             else:
                 self.select_next_item()
@@ -156,8 +220,8 @@ class SpatialFiler(QMainWindow):
     def select_next_item(self):
         print("Selecting next item")
         if self.selected_files:
-            item = self.selected_files[0]
-            self.selected_files.remove(item)
+            item = next(iter(self.selected_files))
+            del self.selected_files[item]
         else:
             item = self.items[0]        
         item.unhighlight()
@@ -169,14 +233,14 @@ class SpatialFiler(QMainWindow):
                 next_item = self.items[index + 1]
             else:
                 next_item = self.items[0]
-            self.selected_files = [next_item]
+            self.selected_files = {next_item: True}
             next_item.highlight()
 
     def select_previous_item(self):
         print("Selecting previous item")
         if self.selected_files:
-            item = self.selected_files[0]
-            self.selected_files.remove(item)
+            item = next(iter(self.selected_files))
+            del self.selected_files[item]
         else:
             item = self.items[len(self.items) - 1]   
         item.unhighlight()
@@ -188,7 +252,7 @@ class SpatialFiler(QMainWindow):
                 previous_item = self.items[index - 1]
             else:
                 previous_item = self.items[-1]
-            self.selected_files = [previous_item]
+            self.selected_files = {previous_item: True}
             previous_item.highlight()
 
     def populate_dropdown(self):
@@ -199,14 +263,15 @@ class SpatialFiler(QMainWindow):
                 self.dropdown.hide()
                 return
             paths = []
-            while os.path.exists(path):
-                paths.append(path)
-                if os.path.normpath(path) == os.path.normpath(QDir.rootPath()):
-                    break
-                # On Windows, stop at the drive letter, otherwise we can get an infinite loop
-                if sys.platform == "win32" and len(path) == 3 and path[1] == ":":
-                    break
-                path = os.path.dirname(path)
+            # The ancestors of an existing directory exist as well, so only the directory itself needs to be checked
+            if os.path.exists(path):
+                while True:
+                    paths.append(path)
+                    parent = os.path.dirname(path)
+                    # Stop at the root directory or, on Windows, at the drive letter, which are their own parents
+                    if parent == path:
+                        break
+                    path = parent
             paths.reverse()
             for path in paths:
                 self.dropdown.addItem(robust_filename(path))
@@ -225,17 +290,14 @@ class SpatialFiler(QMainWindow):
 
     def update_status_bar(self):
         path = self.path
-        item_count = len([f for f in QDir(path).entryList() if f not in [".", ".."]])
+        # The items are kept in sync with the directory, so counting them does not need another directory listing;
+        # the desktop directory also shows the disks and the Trash, which are not in it
+        if self.is_desktop_directory:
+            item_count = sum(1 for item in self.items if os.path.dirname(item.path) == path)
+        else:
+            item_count = len(self.items)
         try:
-            free_space = shutil.disk_usage(path).free
-            if free_space < 1024:
-                free_space_str = f"{free_space} Bytes"
-            elif free_space < 1024 ** 2:
-                free_space_str = f"{free_space / 1024:.2f} KB"
-            elif free_space < 1024 ** 3:
-                free_space_str = f"{free_space / (1024 ** 2):.2f} MB"
-            else:
-                free_space_str = f"{free_space / (1024 ** 3):.2f} GB"
+            free_space_str = format_size(get_free_space(path))
         except Exception as e:
             free_space_str = "Unknown"
             print(f"Error getting free space: {e}")
@@ -247,33 +309,83 @@ class SpatialFiler(QMainWindow):
         i = None
 
     def directory_changed(self, path):
-        if not os.path.exists(self.path):
-            self.close()
+        # Restarting the timer postpones the rescan until the changes have settled;
+        # during long bursts, e.g., while a large archive is being extracted, the window is still updated every 2 seconds
+        if not self.rescan_timer.isActive():
+            self.rescan_burst_start = time.monotonic()
+        elif time.monotonic() - self.rescan_burst_start >= 2:
             return
+        self.rescan_timer.start()
 
-        # Remove items from the window that are not in the directory anymore
-        items_to_remove = []
-        for item in self.items:
-            if not os.path.exists(item.path):
-                items_to_remove.append(item)
-        for item in items_to_remove:
-            item.hide()
-            if self.container.layout():
-                self.container.layout().removeWidget(item)
-            self.items.remove(item)
-            item.deleteLater()
-        self.populate_items()  # This adds new items to the window
-        self.update_container_size()
-
-    def file_changed(self, path):
-        if not os.path.exists(self.path):
+    def rescan_directory(self):
+        try:
+            directory_mtime = os.stat(self.path).st_mtime_ns
+        except OSError:
             self.close()
             return
-        self.update_container_size()
+        # Adding, removing or renaming entries changes the modification time of the directory;
+        # if it is the same as when the directory was listed last, the notification was about something else
+        if directory_mtime == self.directory_mtime:
+            return
+
+        with self.batched_updates():
+            # List the directory once; the listing is used both to find the items that are gone and to add the new ones
+            try:
+                entries = self.list_directory()
+                existing_paths = {entry.path for entry in entries}
+            except OSError:
+                # populate_items will report the error
+                entries = None
+
+            # Remove items from the window that are not in the directory anymore
+            items_to_remove = []
+            for item in self.items:
+                if entries is not None and os.path.dirname(item.path) == self.path:
+                    if item.path not in existing_paths:
+                        items_to_remove.append(item)
+                # Disks are not in the directory, so check them separately; the Trash is always shown,
+                # even when its directory does not exist yet, so it is not removed and added again on every rescan
+                elif not item.is_trash and not os.path.exists(item.path):
+                    items_to_remove.append(item)
+            for item in items_to_remove:
+                item.hide()
+                if self.container.layout():
+                    self.container.layout().removeWidget(item)
+                self._items_by_path.pop(item.path, None)
+                self._item_names[item.name] -= 1
+                if not self._item_names[item.name]:
+                    del self._item_names[item.name]
+                self.remove_item_from_grid(item)
+                self.highlighted_items.discard(item)
+                self.highlighted_text_items.discard(item)
+                item.deleteLater()
+            if items_to_remove:
+                # Rebuild the list in one pass instead of calling list.remove, which is O(N), for each removed item
+                removed = set(items_to_remove)
+                self.items = [item for item in self.items if item not in removed]
+                # The widest item and the items at the right and bottom edges may be gone
+                self._max_item_width = max((item.width() for item in self.items), default=0)
+                self._items_extent = None
+            self.populate_items(entries)  # This adds new items to the window
+            self.update_container_size()
+        if not self.is_desktop_window:
+            self.update_status_bar()
+
+    @contextlib.contextmanager
+    def batched_updates(self):
+        # Repaint the container once after adding, removing or moving many items instead of once per item
+        updates_were_enabled = self.container.updatesEnabled()
+        self.container.setUpdatesEnabled(False)
+        try:
+            yield
+        finally:
+            self.container.setUpdatesEnabled(updates_were_enabled)
 
     def paintEvent(self, event):
-        if self.is_selecting:
+        # Only the part of the window that needs repainting is drawn
+        if self.is_selecting and event.rect().intersects(self.selection_rect.adjusted(-1, -1, 1, 1)):
             painter = QPainter(self)
+            painter.setClipRect(event.rect())
             painter.setPen(QPen(Qt.GlobalColor.gray, 1))
             painter.drawRect(self.selection_rect)
         
@@ -328,7 +440,7 @@ class SpatialFiler(QMainWindow):
         up_action = QAction("Up", self)
         up_action.setShortcuts(["Ctrl+Up", "Ctrl+Shift+Up"])
         up_action.triggered.connect(self.open_parent)
-        if not os.path.exists(parent) or os.path.normpath(self.path) == os.path.normpath(QDir.rootPath()):
+        if not os.path.exists(parent) or self.path == app.root_path:
             up_action.setDisabled(True)
         go_menu.addAction(up_action)
         go_menu.addSeparator()
@@ -341,7 +453,7 @@ class SpatialFiler(QMainWindow):
             go_menu.addAction(start_menu_action)
         # View Menu
         view_menu = self.menu_bar.addMenu("View")
-        if os.path.normpath(self.path) == get_desktop_directory():
+        if self.is_desktop_directory:
             align_items_desktop_action = QAction("Align Items", self)
             align_items_desktop_action.triggered.connect(self.align_items_desktop)
             view_menu.addAction(align_items_desktop_action)
@@ -371,10 +483,11 @@ class SpatialFiler(QMainWindow):
             app.log_console.add_menu_items(help_menu, self)
 
     def select_all(self):
-        for item in self.items:
-            self.selected_files.clear()
-            self.selected_files.append(item)
-            item.highlight()
+        self.selected_files = dict.fromkeys(self.items, True)
+        with self.batched_updates():
+            for item in self.items:
+                item.highlight()
+        self.update_menu_state()
 
     def cut_selected_items(self):
         app.to_cut = True
@@ -406,7 +519,7 @@ class SpatialFiler(QMainWindow):
     def open_parent(self):
         # Detect whether the Shift key is pressed; if yes; if yes, close the current window if it is not the fullscreen desktop window
         parent = os.path.dirname(self.path)
-        if (QApplication.keyboardModifiers() == Qt.KeyboardModifier.ControlModifier | Qt.KeyboardModifier.ShiftModifier) and self.is_desktop_window == False:
+        if close_modifiers_pressed() and self.is_desktop_window == False:
             if os.path.exists(parent):
                 self.open(parent)
                 self.close()
@@ -432,81 +545,171 @@ class SpatialFiler(QMainWindow):
             max_y += self.status_bar.height()
         self.resize(max_x, max_y)
 
-    def populate_items(self):
-        if os.path.normpath(self.path) == get_desktop_directory():
+    def populate_items(self, entries=None):
+        # entries can be passed in by a caller that has already listed the directory.
+        # The container is resized and repainted once after all items have been added instead of after each of them
+        with self.batched_updates():
+            self._populating = True
+            try:
+                self.add_directory_items(entries)
+            finally:
+                self._populating = False
+            self.update_container_size()
+
+    def add_directory_items(self, entries):
+        if self.is_desktop_directory:
 
             # Add every disk in the system
             print("Adding disks")
             for disk in QDir.drives():
-                if not any(item.name == robust_filename(disk.path()) for item in self.items):
+                if robust_filename(disk.path()) not in self._item_names:
                     # The name of the disk is the first part of the path, e.g. "C:" or "D:"
                     disk_name = disk.path()
                     print("Adding disk", disk_name)
                     self.add_item(disk.path(), True)
 
             # Add the Trash item
-            if not any(item.name == app.trash_name for item in self.items):
+            if app.trash_name not in self._item_names:
                 print("Adding Trash item")
                 trash = os.path.join(self.path, app.trash_name)
                 self.add_item(trash, True)
     
         try:
-            entries = os.listdir(self.path)
+            if entries is None:
+                entries = self.list_directory()
             if not entries:
                 print("No items found.")
             else:
+                settings_temp_file = app.desktop_settings_file + ".tmp"
                 for entry in entries:
-                    # Skip if already in the list
-                    if any(item.path == self.path for item in self.items):
+                    # .DS_Spatial is a special file that we don't want to show, nor the temporary file it is written to
+                    if entry.name == app.desktop_settings_file or entry.name == settings_temp_file:
                         continue
-                    # .DS_Spatial is a special file that we don't want to show
-                    if entry == app.desktop_settings_file:
+                    # ~/Desktop is a special case; we don't want to show it in the home directory.
+                    # Both paths are normalized, so comparing them is enough
+                    if entry.path == app.desktop_directory:
                         continue
-                    # ~/Desktop is a special case; we don't want to show it
-                    if self.path == os.path.basename(get_desktop_directory()) and entry == "Desktop":
+                    # Skip if already in the list; entry.path is the same as os.path.join(self.path, entry.name)
+                    if entry.path in self._items_by_path:
                         continue
-                    entry_path = os.path.join(self.path, entry)
-                    is_directory = os.path.isdir(entry_path)
-                    # print(f"Adding item: {entry}")
-                    self.add_item(entry_path, is_directory)
+                    # The file type comes with the directory listing; only symlinks need a stat call
+                    try:
+                        is_directory = entry.is_dir()
+                    except OSError:
+                        is_directory = False
+                    # print(f"Adding item: {entry.name}")
+                    self.add_item(entry.path, is_directory)
         except Exception as e:
             print(f"Error accessing directory: {e}")
 
+    def list_directory(self):
+        directory_mtime = os.stat(self.path).st_mtime_ns
+        # On file systems with coarse timestamps, a change right after the listing can leave the modification time unchanged,
+        # so a very recent modification time is not remembered and the next rescan lists the directory again
+        self.directory_mtime = directory_mtime if time.time_ns() - directory_mtime > 2_000_000_000 else None
+        # os.scandir gets the file type together with the name, so there is no extra stat call per entry
+        with os.scandir(self.path) as iterator:
+            return list(iterator)
+
     def calculate_max_width(self):
-        return max(item.width() for item in self.items) if self.items else 150
+        return self._max_item_width if self.items else 150
 
     def add_item(self, path, is_directory):
-        if any(item.path == path for item in self.items):
+        if path in self._items_by_path:
             return
-        position = QPoint(self.start_x + len(self.items) % 5 * (self.calculate_max_width() + self.horizontal_spacing), 
-                          self.start_y + len(self.items) // 5 * (self.line_height + self.vertical_spacing))
         # Check whether a position is provided in the .DS_Spatial file; if yes, use it
-        settings_file = os.path.join(self.path, app.desktop_settings_file)
-        if os.path.exists(settings_file):
-            with open(settings_file, "r") as file:
-                try:
-                    settings = json.load(file)
-                    for item in settings["items"]:
-                        if item["name"].replace("$Recycle.Bin", app.trash_name) == robust_filename(path):
-                            position = QPoint(item["x"], item["y"])
-                except json.JSONDecodeError as e:
-                    print(f"Error reading settings file: {e}")
+        saved_position = self._saved_positions.get(robust_filename(path))
+        if saved_position is not None:
+            position = QPoint(*saved_position)
+        else:
+            # Only items without a stored position need a free place
+            position = QPoint(self.start_x + len(self.items) % 5 * (self.calculate_max_width() + self.horizontal_spacing), 
+                              self.start_y + len(self.items) // 5 * (self.line_height + self.vertical_spacing))
 
         item = Item(path, is_directory, position, self.container)
         item.move(position)
         item.show()
+        if self.items and item.name < self.items[-1].name:
+            self._items_sorted = False
         self.items.append(item)
+        self._items_by_path[item.path] = item
+        self._item_names[item.name] += 1
+        self._max_item_width = max(self._max_item_width, item.width())
+        self.update_item_in_grid(item)
+        self.update_items_extent(item)
         self.update_container_size()
 
+    def start_spring_open_timer(self, item):
+        self.hovered_item = item
+        self.spring_open_timer.start()
+
+    def stop_spring_open_timer(self, item):
+        # Only the item that started the timer stops it, e.g., leaving an item after the next one was entered does not
+        if self.hovered_item is item:
+            self.spring_open_timer.stop()
+            self.hovered_item = None
+
+    def spring_open_hovered_item(self):
+        item, self.hovered_item = self.hovered_item, None
+        if item is not None:
+            item.spring_open()
+
+    def grid_cells(self, x, y, width, height):
+        cell_size = self._grid_cell_size
+        return [(column, row)
+                for column in range(x // cell_size, (x + width) // cell_size + 1)
+                for row in range(y // cell_size, (y + height) // cell_size + 1)]
+
+    def update_item_in_grid(self, item):
+        # Take the item out of the cells it was in before and put it into the cells it overlaps now
+        self.remove_item_from_grid(item)
+        item.grid_cells = self.grid_cells(item.x(), item.y(), item.width(), item.height())
+        for cell in item.grid_cells:
+            self._grid.setdefault(cell, []).append(item)
+
+    def remove_item_from_grid(self, item):
+        for cell in item.grid_cells:
+            items_in_cell = self._grid.get(cell)
+            if items_in_cell and item in items_in_cell:
+                items_in_cell.remove(item)
+                if not items_in_cell:
+                    del self._grid[cell]
+        item.grid_cells = []
+
+    def items_at(self, pos):
+        # Candidates for hit-testing at pos; the caller still needs to check the exact geometry
+        cell_size = self._grid_cell_size
+        return list(self._grid.get((pos.x() // cell_size, pos.y() // cell_size), ()))
+
+    def update_items_extent(self, item, old_geometry=None):
+        # Only when an item at the right or bottom edge moves away from it, the edges need to be recomputed from all items
+        if self._items_extent is None:
+            return
+        right, bottom = self._items_extent
+        if old_geometry is not None and (old_geometry.right() >= right or old_geometry.bottom() >= bottom):
+            self._items_extent = None
+            return
+        geometry = item.geometry()
+        self._items_extent = (max(right, geometry.right()), max(bottom, geometry.bottom()))
+
     def update_container_size(self):
+        if self._populating:
+            return
         if len(self.items) > 0:
-            max_x = max(item.x() + item.width() for item in self.items) + 10
-            max_y = max(item.y() + item.height() for item in self.items) + 10
-            self.container.setMinimumSize(QSize(max_x, max_y))
+            if self._items_extent is None:
+                # A single pass over the items gives the rectangle that contains all of them
+                bounding_rect = QRect()
+                for item in self.items:
+                    bounding_rect = bounding_rect.united(item.geometry())
+                self._items_extent = (bounding_rect.right(), bounding_rect.bottom())
+            right, bottom = self._items_extent
+            size = QSize(right + 1 + 10, bottom + 1 + 10)
+            if size != self.container.minimumSize():
+                self.container.setMinimumSize(size)
 
     def mousePressEvent(self, event):
 
-        for item in self.items:
+        for item in list(self.highlighted_text_items):
             item.text_label_unhighlight()
 
         scroll_pos = QPoint(self.scroll_area.horizontalScrollBar().value(),
@@ -515,7 +718,7 @@ class SpatialFiler(QMainWindow):
 
         if event.button() == Qt.MouseButton.LeftButton:
             clicked_item = None
-            for item in self.items:
+            for item in self.items_at(adjusted_pos):
                 if (item.x() <= adjusted_pos.x() <= item.x() + item.width()) and \
                 (item.y() <= adjusted_pos.y() <= item.y() + item.height()):
                     # Find out if the click was on the icon or not, 
@@ -533,61 +736,58 @@ class SpatialFiler(QMainWindow):
             if clicked_item:
                 if event.modifiers() == Qt.KeyboardModifier.ControlModifier:
                     if clicked_item in self.selected_files:
-                        self.selected_files.remove(clicked_item)
+                        del self.selected_files[clicked_item]
                         clicked_item.unhighlight()
                     else:
-                        self.selected_files.append(clicked_item)
+                        self.selected_files[clicked_item] = True
                         clicked_item.highlight()
                 else:
                     if clicked_item not in self.selected_files:
-                        self.selected_files = [clicked_item]
-                        for f in self.items:
-                            if f != clicked_item:
-                                f.unhighlight()
+                        # Besides the selected items, e.g., a folder that something was dragged onto can be highlighted
+                        for f in list(self.highlighted_items):
+                            f.unhighlight()
+                        self.selected_files = {clicked_item: True}
                         clicked_item.highlight()
                     
                     self.dragging = True
                     self.last_pos = adjusted_pos
                     self.update_menu_state()
 
-                    # Create a QGraphicsScene to hold the icons
-                    scene = QGraphicsScene()
+                    # Copy the already rendered icon pixmaps of the selected items next to each other into one pixmap
                     icon_spacing = 10  # Space between icons
-                    x_offset = 0
-
-                    # Add each selected item's icon to the scene
-                    for item in self.selected_files:
-                        icon_pixmap = item.icon_label.pixmap()
-                        pixmap_item = QGraphicsPixmapItem(icon_pixmap)
-                        pixmap_item.setPos(x_offset, 0)  # Position the icon
-                        scene.addItem(pixmap_item)
-                        x_offset += icon_pixmap.width() + icon_spacing  # Update offset for next icon
-                        # FIXME: Use the items' real positions instead; can this be done without using a QGraphicsView?
-
-                    # Create a QPixmap from the scene
-                    scene_rect = scene.itemsBoundingRect()
-                    combined_pixmap = QPixmap(scene_rect.size().toSize())
+                    icon_pixmaps = [item.icon_pixmap() for item in self.selected_files]
+                    combined_width = sum(icon_pixmap.width() for icon_pixmap in icon_pixmaps) + icon_spacing * (len(icon_pixmaps) - 1)
+                    combined_height = max(icon_pixmap.height() for icon_pixmap in icon_pixmaps)
+                    combined_pixmap = QPixmap(max(combined_width, 1), max(combined_height, 1))
                     combined_pixmap.fill(QColor(0, 0, 0, 0))
                     painter = QPainter(combined_pixmap)
-                    scene.render(painter, target=scene_rect, source=scene_rect)
+                    x_offset = 0
+                    for icon_pixmap in icon_pixmaps:
+                        painter.drawPixmap(x_offset, 0, icon_pixmap)
+                        x_offset += icon_pixmap.width() + icon_spacing  # Update offset for next icon
+                        # FIXME: Use the items' real positions instead
                     painter.end()
 
                     # Set the combined pixmap for the drag
                     drag = QDrag(self)
                     mime_data = QMimeData()
-                    for item in self.selected_files:
-                        mime_data.setUrls([QUrl.fromLocalFile(f.path) for f in self.selected_files])
+                    mime_data.setUrls([QUrl.fromLocalFile(f.path) for f in self.selected_files])
+                    # Within this process, the dragged items are passed along by key rather than being serialized
+                    key = uuid.uuid4().hex
+                    _drag_payloads[key] = {"window": self, "items": list(self.selected_files)}
+                    mime_data.setData(SPATIAL_DRAG_MIME_TYPE, key.encode("ascii"))
                     drag.setMimeData(mime_data)
                     drag.setPixmap(combined_pixmap)
                     drag.setHotSpot(QPoint(int(app.icon_size / 2), int(app.icon_size / 2)))
                     drag.exec()
+                    _drag_payloads.pop(key, None)
             else:
                 self.is_selecting = True
                 self.selection_rect = QRect(adjusted_pos.x(), adjusted_pos.y(), 0, 0)
                 self.update()
-                self.selected_files = []
-                for item in self.items:
+                for item in list(self.highlighted_items):
                     item.unhighlight()
+                self.selected_files = {}
                 self.update_menu_state()
 
     def mouseMoveEvent(self, event):
@@ -595,55 +795,57 @@ class SpatialFiler(QMainWindow):
                             self.scroll_area.verticalScrollBar().value())
         adjusted_pos = event.pos() + scroll_pos
 
+        # Nothing changed since the last event, so there is nothing to do
+        if adjusted_pos == self._last_move_pos:
+            return
+        self._last_move_pos = adjusted_pos
+
+        # The drag of the selected items is started in mousePressEvent and then run by Qt,
+        # so there is nothing to do here while dragging
         if self.dragging:
-            # Check if at least one of the selected items is being dragged, if not, return
-            if not any(item.underMouse() for item in self.selected_files):
-                return
-            print("Dragging")
-            # Let Qt drag the selected items
-            # Set mime data
-            mime_data = QMimeData()
-            mime_data.setUrls([QUrl.fromLocalFile(f.path) for f in self.selected_files])
-            drag = QDrag(self)
-            drag.setMimeData(mime_data)
-            drag.setPixmap(self.selected_files[0].icon_label.pixmap())
-            # TODO: Make it so that the icon doesn't jump to be at the top left corner of the mouse cursor
-            # FIXME: Instead of hardcoding the hot spot to be half the icon size, it should be the position of the mouse cursor relative to the item
-            drag.setHotSpot(QPoint(int(app.icon_size/2), int(app.icon_size/2)))
-            drag.exec()
+            return
 
-        elif self.is_selecting:
+        if self.is_selecting:
+            old_selection_rect = self.selection_rect
             self.selection_rect = QRect(min(self.selection_rect.x(), adjusted_pos.x()),
                                         min(self.selection_rect.y(), adjusted_pos.y()),
                                         abs(adjusted_pos.x() - self.selection_rect.x()),
                                         abs(adjusted_pos.y() - self.selection_rect.y()))
-            self.update()
-            for item in self.items:
-                if (self.selection_rect.x() <= item.x() + item.width() and
-                    item.x() <= self.selection_rect.x() + self.selection_rect.width() and
-                    self.selection_rect.y() <= item.y() + item.height() and
-                    item.y() <= self.selection_rect.y() + self.selection_rect.height()):
-                    if item not in self.selected_files:
-                        self.selected_files.append(item)
-                        item.highlight()
-                else:
-                    if item in self.selected_files:
-                        self.selected_files.remove(item)
-                        item.unhighlight()
+            # Repaint only the area covered by the old and the new rubber band, including the pen width
+            self.update(old_selection_rect.united(self.selection_rect).adjusted(-2, -2, 2, 2))
+            # Only the items in the grid cells under the rubber band can touch it; a dict keeps them in order without duplicates
+            items_in_rect = {}
+            rect = self.selection_rect
+            # Items that touch the rubber band or are one pixel away from it count as inside, also when it has no width or height yet
+            hit_rect = rect.adjusted(-1, -1, 1, 1)
+            for cell in self.grid_cells(rect.x(), rect.y(), rect.width(), rect.height()):
+                for item in self._grid.get(cell, ()):
+                    if hit_rect.intersects(item.geometry()):
+                        items_in_rect[item] = True
+            # Items outside of the rubber band can only need a change if they are selected
+            for item in [item for item in self.selected_files if item not in items_in_rect]:
+                del self.selected_files[item]
+                item.unhighlight()
+            for item in items_in_rect:
+                if item not in self.selected_files:
+                    self.selected_files[item] = True
+                    item.highlight()
 
     def mouseReleaseEvent(self, event):
+        self._last_move_pos = None
         if self.dragging:
             self.dragging = False
             self.update_container_size()
         elif self.is_selecting:
             self.is_selecting = False
+            # Remove the rubber band by repainting only the area it covered
+            self.update(self.selection_rect.adjusted(-2, -2, 2, 2))
             self.selection_rect = QRect(0, 0, 0, 0)
-            self.update()
 
     def open_selected_items(self):
         for item in self.selected_files:
             item.open(None)
-        if (QApplication.keyboardModifiers() == Qt.KeyboardModifier.ControlModifier | Qt.KeyboardModifier.ShiftModifier) and self.is_desktop_window == False:
+        if close_modifiers_pressed() and self.is_desktop_window == False:
             self.close()
 
     def update_menu_state(self):
@@ -659,27 +861,29 @@ class SpatialFiler(QMainWindow):
         if self.path in app.open_windows:
             del app.open_windows[self.path]
 
+        unwatch_directory(self)
+        self.rescan_timer.stop()
+
         # Store window position and size in .DS_Spatial JSON file in the directory of the window
         settings_file = os.path.join(self.path, app.desktop_settings_file)
         if os.access(self.path, os.W_OK):
             settings = {}
             settings["position"] = {"x": self.pos().x(), "y": self.pos().y()}
-            # Determine the screen this window is on
-            for screen in QApplication.screens():
-                if screen.geometry().contains(QApplication.activeWindow().frameGeometry()):
-                    settings["screen"] = {"x": screen.geometry().x(), "y": screen.geometry().y(), "width": screen.geometry().width(), "height": screen.geometry().height()}
-                    break
+            # Determine the screen this window is on; this window is not necessarily the active window while it is being closed
+            screen = QApplication.screenAt(self.frameGeometry().center())
+            if screen is not None:
+                screen_geometry = screen.geometry()
+                settings["screen"] = {"x": screen_geometry.x(), "y": screen_geometry.y(), "width": screen_geometry.width(), "height": screen_geometry.height()}
             settings["size"] = {"width": self.width(), "height": self.height()}
             settings["items"] = []
             for item in self.items:
                 if item.name != app.desktop_settings_file:
-                    settings["items"].append({"name": robust_filename(item.path), "x": item.pos().x(), "y": item.pos().y()})
-            try:
-                with open(settings_file, "w") as file:
-                    json.dump(settings, file, indent=4)
-                    print(f"Written settings to {settings_file}")
-            except Exception as e:
-                print(f"Error writing settings file: {e}")
+                    pos = item.pos()
+                    settings["items"].append({"name": item.filename, "x": pos.x(), "y": pos.y()})
+            # Nothing needs to be written if the window and the items are where the settings file already has them,
+            # e.g., after just browsing; an unchanged settings file is not parsed again to find out
+            if load_settings(settings_file) != settings:
+                QThreadPool.globalInstance().start(SaveSettingsJob(settings_file, settings))
         else:
             print(f"Cannot write to {settings_file}")
         event.accept()
@@ -688,7 +892,7 @@ class SpatialFiler(QMainWindow):
         if self.initial_position is None:
             self.initial_position = event.position()
 
-        print("Drag enter event")
+        debug_print("Drag enter event")
         if event.mimeData().hasUrls():
             event.accept()
         else:
@@ -700,236 +904,425 @@ class SpatialFiler(QMainWindow):
     def dropEvent(self, event):
         initial_position = self.initial_position
         self.initial_position = None
-        print("Drop event")
+        debug_print("Drop event")
         if event.mimeData().hasUrls():
             urls = event.mimeData().urls()
-            for url in urls:
-                path = url.toLocalFile()
-                # NOTE: normpath needs to be used to avoid issues with different path separators like / and \ on Windows
-                print("Dropped file:", os.path.normpath(path))
-                print("Dropped in window for path:", os.path.normpath((self.path)))
-                # Check if the file is already in the directory; if yes, just move its position
-                if os.path.normpath(os.path.dirname(path)) == os.path.normpath(self.path):
-                    print("File was moved within the same directory")
+            # The scroll position is the same for all dropped items
+            scroll_offset = QPoint(self.scroll_area.horizontalScrollBar().value(), self.scroll_area.verticalScrollBar().value())
+            # Items dragged within this window come with the drag payload, so there is no need to turn the URLs back into items
+            # Other processes can put anything under the same type; such data just does not match a key
+            key = bytes(event.mimeData().data(SPATIAL_DRAG_MIME_TYPE)).decode("ascii", errors="ignore")
+            payload = _drag_payloads.get(key)
+            if payload and payload["window"] is self:
+                debug_print("Items were moved within the same window")
+                # Ignore moves below a threshold distance
+                if initial_position is None or (event.position() - initial_position).manhattanLength() < 20:
+                    event.ignore()
+                    return
+                for item in payload["items"]:
+                    # A rescan during the drag can have removed some of the dragged items
+                    if self._items_by_path.get(item.path) is item:
+                        self.move_dropped_item(item, event, scroll_offset)
+                event.accept()
+                return
+            # NOTE: normpath needs to be used to avoid issues with different path separators like / and \ on Windows;
+            # self.path and the paths of the items are normalized already
+            paths = [os.path.normpath(url.toLocalFile()) for url in urls]
+            debug_print("Dropped files:", paths)
+            debug_print("Dropped in window for path:", self.path)
+            # Files that are already in the directory just change their position, the others are moved, copied or linked here
+            same_directory_paths = []
+            other_paths = []
+            for path in paths:
+                (same_directory_paths if os.path.dirname(path) == self.path else other_paths).append(path)
+            if same_directory_paths:
+                debug_print("Files were moved within the same directory")
+                # Ignore moves below a threshold distance; drags that did not start in this window have no initial position
+                # QApplication.startDragDistance() is the default value that Qt uses for this
+                if initial_position is not None:
                     distance = (event.position() - initial_position).manhattanLength()
-                    print("Distance from initial position:", distance)
-                    # Ignore moves below a threshold distance
-                    # QApplication.startDragDistance() is the default value that Qt uses for this
+                    debug_print("Distance from initial position:", distance)
                     if distance < 20:
                         event.ignore()
                         return
-                    for item in self.items:
-                        if os.path.normpath(item.path) == os.path.normpath(path):
-                            drop_position = event.position()
-                            print("Moving to coordinates", drop_position.x(), drop_position.y())
-                            # FIXME: Apparently, QDropEvent's pos() method gives the position of the mouse cursor at the time of the drop event.
-                            # That is not what we want. We want the position of the item that is being dropped, not the mouse cursor.
-                            # Do we need mapToGlobal() or mapFromGlobal()? Or do we need to do something differently in the startDrag event first, like adding all selected item locations to the drag event?
-                            pixmap_height = item.icon_label.pixmap().height()
-                            drop_position = QPoint(int(drop_position.x()), int(drop_position.y() - pixmap_height))
-                            # The next line currently works because the mouse is set to be in the center of the item when the drag starts,
-                            # but that is not a good solution because it makes the dragged icon jump at the beginning of the drag
-                            drop_position = QPoint(drop_position.x() - int(item.width()/2), drop_position.y() - int(app.icon_size/4))
-                            # Take into consideration the scroll position
-                            drop_position += QPoint(self.scroll_area.horizontalScrollBar().value(), self.scroll_area.verticalScrollBar().value())
-                            # If the Alt modifier key is pressed, move to something that is a multiple of 24 - this is kind of a grid
-                            if event.modifiers() == Qt.KeyboardModifier.AltModifier:
-                                drop_position = QPoint(int(drop_position.x() / app.icon_size) * app.icon_size, int(drop_position.y() / app.icon_size) * app.icon_size)
-                            item.move(drop_position)
-                            break
-                else:
-                    # Files from another window are dropped on this window
-                    file_paths = [url.toLocalFile() for url in urls]
-                    # Path onto which the files were dropped
-                    drop_target = self.path
-                    if not file_paths:
-                        return
-                    try:
-                        menu = QMenu()
-                        move_action = menu.addAction("Move")
-                        copy_action = menu.addAction("Copy")
-                        link_action = menu.addAction("Link")
-                        menu.addSeparator()
-                        cancel_action = menu.addAction("Cancel")
-                        action = menu.exec(QCursor.pos())
-                        if action == move_action:
-                            if sys.platform == 'win32':
-                                windows_file_operations.move_files_with_dialog(file_paths, drop_target)
-                        elif action == copy_action:
-                            if sys.platform == 'win32':
-                                windows_file_operations.copy_files_with_dialog(file_paths, drop_target)
-                        elif action == link_action:
-                            if sys.platform == 'win32':
-                                windows_file_operations.create_shortcuts_with_dialog(file_paths, drop_target)
-                    except Exception as e:
-                        QMessageBox.critical(self, "Error", f"{e}")
+                for path in same_directory_paths:
+                    # Look up the item by its path instead of searching through all items
+                    item = self._items_by_path.get(path)
+                    if item:
+                        self.move_dropped_item(item, event, scroll_offset)
+            if other_paths:
+                # Files from another window are dropped on this window
+                file_paths = other_paths
+                # Path onto which the files were dropped
+                drop_target = self.path
+                try:
+                    menu = QMenu()
+                    move_action = menu.addAction("Move")
+                    copy_action = menu.addAction("Copy")
+                    link_action = menu.addAction("Link")
+                    menu.addSeparator()
+                    cancel_action = menu.addAction("Cancel")
+                    action = menu.exec(QCursor.pos())
+                    if action == move_action:
+                        if sys.platform == 'win32':
+                            windows_file_operations.move_files_with_dialog(file_paths, drop_target)
+                    elif action == copy_action:
+                        if sys.platform == 'win32':
+                            windows_file_operations.copy_files_with_dialog(file_paths, drop_target)
+                    elif action == link_action:
+                        if sys.platform == 'win32':
+                            windows_file_operations.create_shortcuts_with_dialog(file_paths, drop_target)
+                except Exception as e:
+                    QMessageBox.critical(self, "Error", f"{e}")
             event.accept()
         else:
             event.ignore()
 
+    def move_dropped_item(self, item, event, scroll_offset):
+        drop_position = event.position()
+        debug_print("Moving to coordinates", drop_position.x(), drop_position.y())
+        # FIXME: Apparently, QDropEvent's pos() method gives the position of the mouse cursor at the time of the drop event.
+        # That is not what we want. We want the position of the item that is being dropped, not the mouse cursor.
+        # Do we need mapToGlobal() or mapFromGlobal()? Or do we need to do something differently in the startDrag event first, like adding all selected item locations to the drag event?
+        pixmap_height = item.icon_pixmap().height()
+        drop_position = QPoint(int(drop_position.x()), int(drop_position.y() - pixmap_height))
+        # The next line currently works because the mouse is set to be in the center of the item when the drag starts,
+        # but that is not a good solution because it makes the dragged icon jump at the beginning of the drag
+        drop_position = QPoint(drop_position.x() - int(item.width()/2), drop_position.y() - int(app.icon_size/4))
+        # Take into consideration the scroll position
+        drop_position += scroll_offset
+        # If the Alt modifier key is pressed, move to something that is a multiple of 24 - this is kind of a grid
+        if event.modifiers() == Qt.KeyboardModifier.AltModifier:
+            drop_position = QPoint(int(drop_position.x() / app.icon_size) * app.icon_size, int(drop_position.y() / app.icon_size) * app.icon_size)
+        item.move(drop_position)
+
     def align_items(self):
         if not self.items:
             return
-        num_columns = self.width() // self.item_width_for_positioning
-        current_column = 0
-        current_row = 0
-
-        # Iterate over the items
-        for item in self.items:
-            # Calculate the new position of the item
-            new_x = current_column * (self.item_width_for_positioning + self.horizontal_spacing)
-            new_y = current_row * (self.line_height + self.vertical_spacing)
-
-            # If the item's text is wider than the item's icon, need to adjust the x position by moving it to the left
-            if item.text_label.width() > item.icon_label.width():
-                new_x -= int((item.text_label.width() - item.icon_label.width()) / 2)
-
-            # Space on top and at the left of the window, at the top 10 pixels, at the left half of the item width
-            new_x += int(self.item_width_for_positioning/4)
-            new_y += 10
-
-            # Move the item to the new position
-            item.move(new_x, new_y)
-
-            # Increment the current column
-            current_column += 1
-
-            # If the current column is equal to the number of columns, reset it and increment the current row
-            if current_column == num_columns:
-                current_column = 0
-                current_row += 1
-
-        # Update the container size
-        self.update_container_size()
+        with self.batched_updates():
+            num_columns = max(1, self.width() // self.item_width_for_positioning)
+            column_width = self.item_width_for_positioning + self.horizontal_spacing
+            row_height = self.line_height + self.vertical_spacing
+            # Space on top and at the left of the window, at the top 10 pixels, at the left a quarter of the item width
+            space_on_left = int(self.item_width_for_positioning/4)
+            space_on_top = 10
+
+            # Iterate over the items
+            for i, item in enumerate(self.items):
+                # The grid cell follows directly from the index of the item
+                current_row, current_column = divmod(i, num_columns)
+
+                # Calculate the new position of the item;
+                # if the item's text is wider than the item's icon, move the item to the left so that the icons line up
+                new_x = current_column * column_width + space_on_left - item.half_overflow
+                new_y = current_row * row_height + space_on_top
+
+                # Move the item to the new position
+                item.move(new_x, new_y)
+
+            # Update the container size
+            self.update_container_size()
 
-        if not self.is_desktop_window:
-            self.adjust_window_size()
+            if not self.is_desktop_window:
+                self.adjust_window_size()
 
     def align_items_staggered(self):
         if not self.items:
             return
-        num_columns = (self.width() // self.item_width_for_positioning)
-        line_height = int(self.line_height - 1.1 * app.icon_size) # 0.5
-        current_column = 0
-        current_row = 0
-
-        # Sort the items by name
-        self.items.sort(key=lambda x: x.name, reverse=False)
-
-        # Iterate over the items
-        for i, item in enumerate(self.items):
-            # Calculate the new position of the item
-            if current_row % 2 == 0:  # Even row
-                new_x = current_column * (self.item_width_for_positioning + self.horizontal_spacing + app.icon_size)
-            else:  # Odd row
-                new_x = (current_column + 0.5) * (self.item_width_for_positioning + self.horizontal_spacing + app.icon_size)
-
-            new_y = current_row * (line_height + self.vertical_spacing)
-
-            # If the item's text is wider than the item's icon, need to adjust the x position by moving it to the left
-            if item.text_label.width() > item.icon_label.width():
-                new_x -= int((item.text_label.width() - item.icon_label.width()) / 2)
-
-            # Space on top and at the left of the window, at the top 10 pixels, at the left half of the item width
-            new_x += int(self.item_width_for_positioning/4)
-            new_y += 10
-
-            # Move the item to the new position
-            item.move(int(new_x), int(new_y))
+        with self.batched_updates():
+            num_columns = (self.width() // self.item_width_for_positioning)
+            line_height = int(self.line_height - 1.1 * app.icon_size) # 0.5
+            current_column = 0
+            current_row = 0
+
+            # Sort the items by name unless they are still sorted from last time
+            if not self._items_sorted:
+                self.items.sort(key=operator.attrgetter("name"))
+                self._items_sorted = True
+
+            # The x positions of the columns are the same in all even rows and in all odd rows, so compute them only once;
+            # space at the left of the window is a quarter of the item width
+            column_width = self.item_width_for_positioning + self.horizontal_spacing + app.icon_size
+            space_on_left = int(self.item_width_for_positioning/4)
+            even_row_x = [column * column_width + space_on_left for column in range(max(1, num_columns))]
+            odd_row_x = [(column + 0.5) * column_width + space_on_left for column in range(max(1, num_columns))]
+            row_height = line_height + self.vertical_spacing
+
+            # Even rows have num_columns items, odd rows, which are shifted by half a column, one less; every row has at least one
+            row_lengths = (max(1, num_columns), max(1, num_columns - 1))
+            # The x positions and the length of the current row only change when a new row begins
+            row_x = even_row_x
+            row_length = row_lengths[0]
+            # Space on top of the window is 10 pixels
+            new_y = 10
+
+            # Iterate over the items
+            for item in self.items:
+                # If the item's text is wider than the item's icon, move the item to the left so that the icons line up
+                item.move(int(row_x[current_column] - item.half_overflow), new_y)
 
-            # Increment the current column
-            if current_row % 2 == 0:  # Even row
-                current_column += 1
-                if current_column >= num_columns:
-                    current_column = 0
-                    current_row += 1
-            else:  # Odd row
+                # Increment the current column, and begin a new row when the current one is full
                 current_column += 1
-                if current_column >= num_columns - 1:
+                if current_column >= row_length:
                     current_column = 0
                     current_row += 1
+                    row_x = odd_row_x if current_row % 2 else even_row_x
+                    row_length = row_lengths[current_row % 2]
+                    new_y = current_row * row_height + 10
 
-        # Update the container size
-        self.update_container_size()
+            # Update the container size
+            self.update_container_size()
 
-        if not self.is_desktop_window:
-            self.adjust_window_size()
+            if not self.is_desktop_window:
+                self.adjust_window_size()
 
     def align_items_desktop(self):
         if not self.items:
             return
+        with self.batched_updates():
+            num_rows = (self.height() // self.line_height) - 1
+            column_width = self.item_width_for_positioning + self.horizontal_spacing
+            row_height = self.line_height + self.vertical_spacing
+            # The first column is at the right edge of the window, the first row 10 pixels plus 10 pixels of space from the top
+            start_x = self.width() - self.item_width_for_positioning + int(self.item_width_for_positioning / 4)
+            start_y = 10 + 10
+
+            def position_item(item, column, row):
+                new_x = start_x - column * column_width - item.half_overflow
+                new_y = start_y + row * row_height
+                item.move(new_x, new_y)
+
+            # The items other than the Trash fill the columns from the right, each column from top to bottom;
+            # the first column leaves its last row free for the Trash. The Trash item is picked out in the same pass
+            items = []
+            trash = None
+            for item in self.items:
+                if item.name != app.trash_name:
+                    items.append(item)
+                elif trash is None:
+                    trash = item
+            first_index = 0
+            column = 0
+            while first_index < len(items):
+                if num_rows <= 0:
+                    # A window too low for even one row gets all items in the first column
+                    rows_in_column = len(items)
+                elif column == 0 and num_rows > 1:
+                    rows_in_column = num_rows - 1
+                else:
+                    rows_in_column = num_rows
+                column_x = start_x - column * column_width
+                for row, item in enumerate(items[first_index:first_index + rows_in_column]):
+                    item.move(column_x - item.half_overflow, start_y + row * row_height)
+                first_index += rows_in_column
+                column += 1
 
-        num_rows = (self.height() // self.line_height) - 1
-        start_x = self.width() - self.item_width_for_positioning
-        start_y = 10
-        space_on_top = 10
-
-        def position_item(item, column, row):
-            new_x = start_x - column * (self.item_width_for_positioning + self.horizontal_spacing)
-            new_y = start_y + row * (self.line_height + self.vertical_spacing)
-            
-            if item.text_label.width() > item.icon_label.width():
-                new_x -= int((item.text_label.width() - item.icon_label.width()) / 2)
-
-            new_x += int(self.item_width_for_positioning / 4)
-            new_y += space_on_top
-            item.move(new_x, new_y)
-
-        current_column, current_row = 0, 0
-
-        for item in self.items:
-            if item.name == app.trash_name:
-                continue
-            position_item(item, current_column, current_row)
-            current_row += 1
-
-            if current_row == num_rows:
-                current_row = 0
-                current_column += 1
-
-            if current_row == num_rows - 1 and current_column == 0:
-                current_row = 0
-                current_column += 1
-
-        # Position the Trash item
-        trash = next((item for item in self.items if item.name == app.trash_name), None)
-        if trash:
-            position_item(trash, 0, num_rows - 1)
+            # Position the Trash item
+            if trash:
+                position_item(trash, 0, num_rows - 1)
 
     def align_items_circle(self):
         if not self.items:
             return
-        radius = self.width() // 2 - self.horizontal_spacing - self.item_width_for_positioning // 2
+        with self.batched_updates():
+            radius = self.width() // 2 - self.horizontal_spacing - self.item_width_for_positioning // 2
 
-        # Calculate the center of the circle
-        circle_center_x = radius + self.item_width_for_positioning // 2
-        circle_center_y = radius + self.vertical_spacing
+            # Calculate the center of the circle
+            circle_center_x = radius + self.item_width_for_positioning // 2
+            circle_center_y = radius + self.vertical_spacing
 
-        # Iterate over the items
-        for i, item in enumerate(self.items):
-            # Calculate the new position of the item
-            angle = i * 2 * math.pi / len(self.items)
-            new_x = circle_center_x + radius * math.cos(angle)
-            new_y = circle_center_y + radius * math.sin(angle)
+            # Iterate over the items together with their points on the unit circle
+            for item, (cos_angle, sin_angle) in zip(self.items, unit_circle_points(len(self.items))):
+                # Calculate the new position of the item
+                new_x = circle_center_x + radius * cos_angle
+                new_y = circle_center_y + radius * sin_angle
 
-            # If the item's text is wider than the item's icon, need to adjust the x position by moving it to the left
-            if item.text_label.width() > item.icon_label.width():
-                new_x -= int((item.text_label.width() - item.icon_label.width()) / 2)
+                # If the item's text is wider than the item's icon, move the item to the left so that the icons line up
+                new_x -= item.half_overflow
 
-            # Move the item to the new position
-            item.move(int(new_x), int(new_y))
+                # Move the item to the new position
+                item.move(int(new_x), int(new_y))
 
-        if not self.is_desktop_window:
-            self.adjust_window_size()
+            if not self.is_desktop_window:
+                self.adjust_window_size()
 
     def show_about(self):
         dialog = QMessageBox(self)
         dialog.setIconPixmap(app.icon.pixmap(app.icon_size, app.icon_size))
         dialog.setWindowTitle("About")
         dialog.setText("Spatial File Manager\n\nA simple file manager that uses a spatial interface.")
-        dialog.exec()
-
+        # open() instead of exec() does not run a nested event loop; the dialog is deleted when it is closed
+        dialog.setAttribute(Qt.WidgetAttribute.WA_DeleteOnClose)
+        dialog.open()
+
+
+# A single file system watcher is shared by all windows; for each watched path, it notifies the windows showing it
+_shared_watcher = None
+_watching_windows = {}
+
+def watch_directory(window):
+    global _shared_watcher
+    if _shared_watcher is None:
+        _shared_watcher = QFileSystemWatcher()
+        _shared_watcher.directoryChanged.connect(lambda path: notify_watching_windows(path, "directory_changed"))
+    windows = _watching_windows.setdefault(window.path, [])
+    if not windows:
+        _shared_watcher.addPath(window.path)
+    windows.append(weakref.ref(window))
+
+def unwatch_directory(window):
+    # Forget this window and any windows that are gone already; stop watching the path if nobody is interested anymore
+    windows = [ref for ref in _watching_windows.get(window.path, []) if ref() is not None and ref() is not window]
+    if windows:
+        _watching_windows[window.path] = windows
+    elif window.path in _watching_windows:
+        del _watching_windows[window.path]
+        _shared_watcher.removePath(window.path)
+
+def notify_watching_windows(path, handler_name):
+    # Copy the list because handlers may close their window, which unwatches it
+    for ref in list(_watching_windows.get(path, [])):
+        window = ref()
+        if window is not None:
+            getattr(window, handler_name)(path)
+
+# Items whose icons still need to be looked up; a single timer works through them for all windows
+_icon_load_queue = collections.deque()
+_icon_load_timer = None
+
+def queue_icon_load(item):
+    global _icon_load_timer
+    if _icon_load_timer is None:
+        _icon_load_timer = QTimer()
+        _icon_load_timer.setInterval(0)
+        _icon_load_timer.timeout.connect(load_queued_icons)
+    _icon_load_queue.append(item)
+    if not _icon_load_timer.isActive():
+        _icon_load_timer.start()
+
+def load_queued_icons():
+    # Look up icons for at most 10 ms at a time, then let the event loop handle input and painting before continuing
+    deadline = time.monotonic() + 0.01
+    while _icon_load_queue and time.monotonic() < deadline:
+        item = _icon_load_queue.popleft()
+        try:
+            if not item.icon_loaded:
+                item.load_icon()
+        except RuntimeError:
+            # The item was deleted in the meantime, e.g., because its window was closed
+            pass
+    if not _icon_load_queue:
+        _icon_load_timer.stop()
+
+# Units for displaying sizes, largest first
+SIZE_UNITS = [(1 << 30, "GB"), (1 << 20, "MB"), (1 << 10, "KB")]
+
+def format_size(size):
+    for unit_size, unit in SIZE_UNITS:
+        if size >= unit_size:
+            return f"{size / unit_size:.2f} {unit}"
+    return f"{size} Bytes"
+
+def close_modifiers_pressed():
+    """Whether both Ctrl and Shift are held down, which closes the window that an item or the parent is opened from."""
+    # keyboardModifiers() returns the state that Qt has tracked from input events, it does not query the platform
+    close_modifiers = Qt.KeyboardModifier.ControlModifier | Qt.KeyboardModifier.ShiftModifier
+    return (QApplication.keyboardModifiers() & close_modifiers) == close_modifiers
+
+# Free space by device, together with the time it was determined, so that all windows on the same drive share one query
+_free_space_cache = {}
+
+def get_free_space(path):
+    """Free space on the drive of path; the status bars of all windows ask for it every few seconds, so it is cached briefly."""
+    device = os.stat(path).st_dev
+    now = time.monotonic()
+    cached = _free_space_cache.get(device)
+    if cached and now - cached[0] < 5:
+        return cached[1]
+    free_space = shutil.disk_usage(path).free
+    _free_space_cache[device] = (now, free_space)
+    return free_space
+
+# Parsed settings files by path, together with the modification time (in nanoseconds) of the file when it was read
+_settings_cache = {}
+# Locks that serialize writes to the same settings file, by path
+_settings_locks = {}
+
+def load_settings(settings_file):
+    """Read a settings file; returns None if there is no usable one. Unchanged files are only parsed once."""
+    try:
+        mtime = os.stat(settings_file).st_mtime_ns
+    except OSError:
+        return None
+    cached = _settings_cache.get(settings_file)
+    if cached and cached[0] == mtime:
+        return cached[1]
+    try:
+        # The file is read in one go; both orjson and json parse the bytes directly
+        with open(settings_file, "rb") as file:
+            data = file.read()
+        settings = orjson.loads(data) if orjson else json.loads(data)
+    except (OSError, ValueError) as e:
+        print(f"Error reading settings file: {e}")
+        return None
+    _settings_cache[settings_file] = (mtime, settings)
+    return settings
+
+class SaveSettingsSignals(QObject):
+    # Path of the settings file and an error message, which is empty if writing succeeded
+    finished = pyqtSignal(str, str)
+
+class SaveSettingsJob(QRunnable):
+    """Writes a settings file in a worker thread so that closing a window does not wait for the disk."""
+    def __init__(self, settings_file, settings):
+        super().__init__()
+        self.settings_file = settings_file
+        self.settings = settings
+        self.signals = SaveSettingsSignals()
+        self.signals.finished.connect(settings_saved)
+
+    def run(self):
+        # Two jobs for the same file must not write at the same time, e.g., when a window is closed and reopened quickly
+        with _settings_locks.setdefault(self.settings_file, threading.Lock()):
+            try:
+                save_settings(self.settings_file, self.settings)
+                self.signals.finished.emit(self.settings_file, "")
+            except Exception as e:
+                self.signals.finished.emit(self.settings_file, str(e))
 
+def settings_saved(settings_file, error):
+    # Runs in the main thread, where printing to the log console is safe
+    if error:
+        print(f"Error writing settings file: {error}")
+    else:
+        print(f"Written settings to {settings_file}")
+
+def save_settings(settings_file, settings):
+    """Write a settings file atomically so that a crash or a concurrent reader never sees a half-written file."""
+    # Compact JSON is much faster to produce than indented JSON, and is written with a single write call
+    data = orjson.dumps(settings) if orjson else json.dumps(settings, separators=(",", ":")).encode()
+    temp_file = settings_file + ".tmp"
+    fd = os.open(temp_file, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+    try:
+        os.write(fd, data)
+    finally:
+        os.close(fd)
+    os.replace(temp_file, settings_file)
+    # The next window for this directory can use the settings without reading the file again
+    _settings_cache[settings_file] = (os.stat(settings_file).st_mtime_ns, settings)
+
+@functools.lru_cache(maxsize=4096)
+def elide_name(name):
+    """Name elided to at most 150 pixels in the font of the item labels; items with the same name are shown again and again."""
+    return app.item_font_metrics.elidedText(name, Qt.TextElideMode.ElideMiddle, 150)
+
+@functools.lru_cache(maxsize=16)
+def unit_circle_points(count):
+    """Cosine and sine of count angles evenly spaced around the circle; the same item count is aligned again and again."""
+    return tuple((math.cos(i * 2 * math.pi / count), math.sin(i * 2 * math.pi / count)) for i in range(count))
+
+# The same paths are looked up again and again, e.g., for every item when a window is opened or its settings are saved
+@functools.lru_cache(maxsize=4096)
 def robust_filename(path):
     # Use this instead of os.path.basename to avoid issues on Windows
     name = os.path.basename(path)
@@ -946,11 +1339,8 @@ class Item(QWidget):
         super().__init__(parent)
         self.path = os.path.normpath(path)
         self.name = robust_filename(path)
-
-        # For spring-loaded folders
-        self.hover_timer = QTimer(self)
-        self.hover_timer.setSingleShot(True)
-        self.hover_timer.timeout.connect(self.spring_open)
+        # Name of the file on disk, used as the key in the .DS_Spatial file; paths from the directory listing are already normalized
+        self.filename = self.name if self.path == path else robust_filename(self.path)
 
         # On Windows, files ending with .lnk are shortcuts; we remove the final extension from the name
         if sys.platform == "win32" and self.name.endswith(".lnk"):
@@ -958,31 +1348,36 @@ class Item(QWidget):
         
         self.is_directory = is_directory
         self.position = position
+        # Cells of the window's hit-testing grid that this item is currently in
+        self.grid_cells = []
 
         self.setAcceptDrops(True)
 
-        icon_provider = QFileIconProvider()
         # Trash
-        if self.path == os.path.normpath(get_desktop_directory() + "/" + app.trash_name):
-            icon = icon_provider.icon(QFileIconProvider.IconType.Trashcan).pixmap(app.icon_size, app.icon_size)
+        self.is_trash = self.path == app.trash_path
+        if self.is_trash:
             if sys.platform == 'win32':
                 sys_drive = os.getenv('SystemDrive')
                 self.path = f"{sys_drive}\\$Recycle.Bin"
             else:
                 self.path = QDir.homePath() + '/.local/share/Trash/files/'
-        elif appdir.is_appdir(self.path):
-            A = appdir.AppDir(self.path)
-            icon_path = A.get_icon_path()
-            if icon_path:
-                icon = QIcon(icon_path).pixmap(app.icon_size, app.icon_size)
-            else:
-                icon = icon_provider.icon(QFileInfo(self.path)).pixmap(app.icon_size, app.icon_size)
-        else:
-            icon = icon_provider.icon(QFileInfo(self.path)).pixmap(app.icon_size, app.icon_size)
+
+        # Looking up the icon of a file can be slow, so it is only done when the item is painted for the first time;
+        # this way, items outside of the visible part of a large folder do not cost an icon lookup
+        self.icon_loaded = False
+        self.icon_queued = False
+        # Context menu, built when it is first needed
+        self.context_menu = None
+        # Whether the icon and the text label are highlighted; None until their style sheets are set for the first time
+        self.highlighted = None
+        self.text_label_highlighted = None
+        # Path with symbolic links resolved and when it was resolved, see open
+        self.real_path = None
+        self.real_path_time = 0.0
         
-        # Maximum 150 pixels wide, elide the text in the middle
-        font_metrics = QFontMetrics(self.font())
-        self.elided_name = font_metrics.elidedText(self.name, Qt.TextElideMode.ElideMiddle, 150)
+        # Maximum 150 pixels wide in the font of the label, elide the text in the middle
+        font_metrics = app.font_metrics
+        self.elided_name = elide_name(self.name)
 
         # For screenshotting: Replace each letter in the elided name with a random letter; preserve the length. Preserve the case of the letters.
         # import random
@@ -995,13 +1390,6 @@ class Item(QWidget):
         self.icon_size = app.icon_size
         padding = 0  # Padding around icon and text
 
-        # Calculate the text width
-        text_width = font_metrics.horizontalAdvance(self.elided_name)
-        widget_width = max(self.icon_size, text_width) + padding * 2
-
-        # Set the fixed size for the widget, including some padding above and below the content
-        self.setFixedSize(widget_width, self.icon_size + font_metrics.height() + padding * 2)
-
         # Layout setup
         self.layout = QVBoxLayout(self)
         self.layout.setContentsMargins(0, 0, 0, 0)
@@ -1011,7 +1399,6 @@ class Item(QWidget):
         # Icon label setup
         self.icon_label = QLabel(self)
         self.icon_label.setFixedSize(self.icon_size, self.icon_size)
-        self.icon_label.setPixmap(icon)
         self.icon_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
         self.layout.addWidget(self.icon_label, alignment=Qt.AlignmentFlag.AlignHCenter)
 
@@ -1020,9 +1407,7 @@ class Item(QWidget):
         self.text_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
         # FIXME: Increase width of the QLabel by 4 pixels while still having the QLabel centered in the box
 
-        font = QFont()
-        font.setPointSize(8)
-        self.text_label.setFont(font)
+        self.text_label.setFont(app.item_font)
 
         self.layout.addWidget(self.text_label, alignment=Qt.AlignmentFlag.AlignHCenter)
 
@@ -1041,15 +1426,109 @@ class Item(QWidget):
 
         self.text_label_unhighlight()
 
+        # The item is as wide as the wider of the icon and the text label, which is laid out at its size hint
+        text_label_width = self.text_label.sizeHint().width()
+        widget_width = max(self.icon_size, text_label_width) + padding * 2
+
+        # Set the fixed size for the widget, including some padding above and below the content
+        self.setFixedSize(widget_width, self.icon_size + font_metrics.height() + padding * 2)
+
+        # How far the text sticks out on either side of the icon; the align methods move the item to the left by this much
+        # so that the icons line up
+        self.half_overflow = max(0, (text_label_width - self.icon_size) // 2)
+
+    def icon_cache_key(self):
+        # Files of the same type get the same icon, so it is looked up only once per type;
+        # folders can have icons of their own, e.g., the XDG user directories or folders with a custom icon
+        if self.is_trash or self.is_directory or appdir.is_appdir(self.path):
+            return None
+        # The name on disk, which still ends with .lnk for shortcuts on Windows
+        extension = os.path.splitext(self.filename)[1].lower()
+        if not extension or extension in PER_FILE_ICON_EXTENSIONS:
+            return None
+        # The type is only known from the name if exactly one type matches it; otherwise it depends on the content
+        # of the file, so two files with the same extension can have different icons
+        mime_types = app.mime_database.mimeTypesForFileName(self.filename)
+        if len(mime_types) != 1:
+            return None
+        return f"spatial-icon:{mime_types[0].name()}:{app.icon_size}"
+
+    def load_icon(self):
+        icon_provider = app.icon_provider
+        cache_key = self.icon_cache_key()
+        if self.is_trash:
+            icon = icon_provider.icon(QFileIconProvider.IconType.Trashcan).pixmap(app.icon_size, app.icon_size)
+        elif appdir.is_appdir(self.path):
+            A = appdir.AppDir(self.path)
+            icon_path = A.get_icon_path()
+            if icon_path:
+                icon = QIcon(icon_path).pixmap(app.icon_size, app.icon_size)
+            else:
+                icon = icon_provider.icon(QFileInfo(self.path)).pixmap(app.icon_size, app.icon_size)
+        elif cache_key is not None:
+            # QPixmapCache is shared by all items and drops the least recently used icons when it is full
+            icon = QPixmapCache.find(cache_key)
+            if icon is None:
+                icon = icon_provider.icon(QFileInfo(self.path)).pixmap(app.icon_size, app.icon_size)
+                QPixmapCache.insert(cache_key, icon)
+        else:
+            icon = icon_provider.icon(QFileInfo(self.path)).pixmap(app.icon_size, app.icon_size)
+        self.icon_label.setPixmap(icon)
+        self.icon_loaded = True
+
+    def icon_pixmap(self):
+        # Items that were never painted, e.g., selected with Select All while scrolled out of view, have no icon yet
+        if not self.icon_loaded:
+            self.load_icon()
+        return self.icon_label.pixmap()
+
+    def paintEvent(self, event):
+        if not self.icon_loaded and not self.icon_queued:
+            # Icons that were looked up for another item already are shown right away; looking up a new one can take a while,
+            # so those are loaded a few at a time between events and the window does not wait for all of them
+            cache_key = self.icon_cache_key()
+            icon = QPixmapCache.find(cache_key) if cache_key is not None else None
+            if icon is not None:
+                self.icon_label.setPixmap(icon)
+                self.icon_loaded = True
+            else:
+                self.icon_queued = True
+                queue_icon_load(self)
+        super().paintEvent(event)
+
+    def moveEvent(self, event):
+        super().moveEvent(event)
+        # Keep the hit-testing grid of the window and the extent of its items up to date
+        window = self.window()
+        if self.grid_cells and isinstance(window, SpatialFiler):
+            window.update_item_in_grid(self)
+            window.update_items_extent(self, QRect(event.oldPos(), self.size()))
+
     def on_label_clicked(self, event):
         # TODO: unhighlight the text labels of all other items; how to get to the other items?
         self.text_label_highlight()
     
     def highlight(self):
-        self.icon_label.setStyleSheet("background-color: lightblue;")
+        # Setting a style sheet makes Qt restyle the label, so it is only done when the highlighting changes
+        if self.highlighted is not True:
+            self.highlighted = True
+            self.icon_label.setStyleSheet("background-color: lightblue;")
+            self.track_highlight("highlighted_items", True)
 
     def unhighlight(self):
-        self.icon_label.setStyleSheet("border: 0px; background-color: transparent;")
+        if self.highlighted is not False:
+            self.highlighted = False
+            self.icon_label.setStyleSheet("border: 0px; background-color: transparent;")
+            self.track_highlight("highlighted_items", False)
+
+    def track_highlight(self, attribute, highlighted):
+        # Let the window know which of its items are highlighted
+        window = self.window()
+        if isinstance(window, SpatialFiler):
+            if highlighted:
+                getattr(window, attribute).add(self)
+            else:
+                getattr(window, attribute).discard(self)
 
     def rename(self):
         dialog = QDialog(self)
@@ -1070,57 +1549,74 @@ class Item(QWidget):
         buttons.rejected.connect(dialog.reject)
         layout.addWidget(buttons)
 
-        if dialog.exec() == QDialog.DialogCode.Accepted:
-            new_name = line_edit.text()
-            if sys.platform == "win32":
-                try:
-                    windows_file_operations.rename_file_with_dialog(self.path, new_name)
-                except Exception as e:
-                    QMessageBox.critical(self, "Error", f"Error renaming file: {e}")
+        # The renaming happens when the dialog is accepted
+        dialog.accepted.connect(lambda: self.rename_to(line_edit.text()))
+        dialog.setAttribute(Qt.WidgetAttribute.WA_DeleteOnClose)
+        dialog.open()
+
+    def rename_to(self, new_name):
+        if sys.platform == "win32":
+            try:
+                windows_file_operations.rename_file_with_dialog(self.path, new_name)
+            except Exception as e:
+                QMessageBox.critical(self, "Error", f"Error renaming file: {e}")
 
     def text_label_highlight(self):
         if os.access(self.path, os.W_OK):
             self.text_label.setContextMenuPolicy(Qt.ContextMenuPolicy.ActionsContextMenu)
-            self.text_label.setStyleSheet("background-color: black; color: white;")
+            if self.text_label_highlighted is not True:
+                self.text_label_highlighted = True
+                self.text_label.setStyleSheet("background-color: black; color: white;")
+                self.track_highlight("highlighted_text_items", True)
             self.rename()
 
     def text_label_unhighlight(self):
-        self.text_label.setStyleSheet("background-color: rgba(255, 255, 255, 0.66); color: black;")
+        if self.text_label_highlighted is not False:
+            self.text_label_highlighted = False
+            self.text_label.setStyleSheet("background-color: rgba(255, 255, 255, 0.66); color: black;")
+            self.track_highlight("highlighted_text_items", False)
 
     def show_context_menu(self, pos):
         # Check if the click happened on the icon or the text label
         if self.icon_label.geometry().contains(pos):
-            print("Clicked on the icon")
+            debug_print("Clicked on the icon")
         elif self.text_label.geometry().contains(pos):
-            print("Clicked on the text label")
+            debug_print("Clicked on the text label")
         else:
             return
 
         # On Windows, use windows_context_menu.py
         if sys.platform == "win32" and self.path is not None:
+            import windows_context_menu
             windows_context_menu.show_context_menu(self.path)
         else:
-            context_menu = QMenu(self)
-            self.open_action = QAction("Open", self)
-            self.open_action.triggered.connect(self.open)
-            context_menu.addAction(self.open_action)
-            context_menu.addSeparator()
-            self.get_info_action = QAction("Get Info", self)
-            self.get_info_action.triggered.connect(self.get_info)
-            context_menu.addAction(self.get_info_action)
-            context_menu.addSeparator()
-            self.cut_action = QAction("Cut", self)
-            self.cut_action.setDisabled(True)
-            context_menu.addAction(self.cut_action)
-            self.copy_action = QAction("Copy", self)
-            self.copy_action.setDisabled(True)
-            context_menu.addAction(self.copy_action)
-            self.paste_action = QAction("Paste", self)
-            context_menu.addAction(self.paste_action)
-            self.trash_action = QAction("Move to Trash", self)
-            self.trash_action.setDisabled(True)
-            context_menu.addAction(self.trash_action)
-            context_menu.exec(self.mapToGlobal(pos))
+            # The menu is built on the first right-click and reused after that
+            if self.context_menu is None:
+                self.context_menu = self.build_context_menu()
+            self.context_menu.exec(self.mapToGlobal(pos))
+
+    def build_context_menu(self):
+        context_menu = QMenu(self)
+        self.open_action = QAction("Open", self)
+        self.open_action.triggered.connect(self.open)
+        context_menu.addAction(self.open_action)
+        context_menu.addSeparator()
+        self.get_info_action = QAction("Get Info", self)
+        self.get_info_action.triggered.connect(self.get_info)
+        context_menu.addAction(self.get_info_action)
+        context_menu.addSeparator()
+        self.cut_action = QAction("Cut", self)
+        self.cut_action.setDisabled(True)
+        context_menu.addAction(self.cut_action)
+        self.copy_action = QAction("Copy", self)
+        self.copy_action.setDisabled(True)
+        context_menu.addAction(self.copy_action)
+        self.paste_action = QAction("Paste", self)
+        context_menu.addAction(self.paste_action)
+        self.trash_action = QAction("Move to Trash", self)
+        self.trash_action.setDisabled(True)
+        context_menu.addAction(self.trash_action)
+        return context_menu
 
     def get_info(self):
         dialog = QDialog(self)
@@ -1130,18 +1626,28 @@ class Item(QWidget):
         dialog.setLayout(layout)
         
         properties = ["Name", "Kind", "Size", "Location", "Created", "Modified", "Last opened"]
-        file_info = QFileInfo(self.path)
-        values = [""] * len(properties)
-        values[0] = file_info.fileName()
-        values[1] = "Folder" if file_info.isDir() else "Document"
-        values[2] = "N/A" if file_info.isDir() else str(file_info.size()) + " bytes"
-        values[3] = file_info.absolutePath()
+        # Everything shown comes from a single stat call
         try:
-            values[4] = file_info.birthTime().toString()
-        except:
-            values[4] = "N/A"
-        values[5] = file_info.lastModified().toString()
-        values[6] = file_info.lastRead().toString()
+            file_stat = os.stat(self.path)
+        except OSError as e:
+            QMessageBox.critical(self, "Error", f"Error getting information: {e}")
+            return
+        is_directory = stat.S_ISDIR(file_stat.st_mode)
+        def format_time(seconds):
+            return QDateTime.fromMSecsSinceEpoch(int(seconds * 1000)).toString()
+        values = [""] * len(properties)
+        values[0] = os.path.basename(self.path)
+        values[1] = "Folder" if is_directory else "Document"
+        values[2] = "N/A" if is_directory else str(file_stat.st_size) + " bytes"
+        values[3] = os.path.dirname(os.path.abspath(self.path))
+        # os.stat has no creation time on Linux, where Qt can still get it with statx
+        birth_time = getattr(file_stat, "st_birthtime", None)
+        if birth_time is not None:
+            values[4] = format_time(birth_time)
+        else:
+            values[4] = QFileInfo(self.path).birthTime().toString()
+        values[5] = format_time(file_stat.st_mtime)
+        values[6] = format_time(file_stat.st_atime)
         
         for i, property in enumerate(properties):
             label = QLabel(property, dialog)
@@ -1151,7 +1657,13 @@ class Item(QWidget):
             layout.addWidget(label, i, 0)  # Add label to left column
             layout.addWidget(value, i, 1)  # Add value to right column
         
-        dialog.exec()
+        dialog.setAttribute(Qt.WidgetAttribute.WA_DeleteOnClose)
+        dialog.open()
+
+    def stop_spring_open_timer(self):
+        window = self.window()
+        if isinstance(window, SpatialFiler):
+            window.stop_spring_open_timer(self)
 
     def spring_open(self):
         self.open(event=None, spring_open=True)
@@ -1159,49 +1671,55 @@ class Item(QWidget):
         parent = self.parent()
         while parent:
             parent = parent.parent()
-            print(parent.__class__.__name__)
+            debug_print(parent.__class__.__name__)
             if parent.__class__.__name__ == "SpatialFiler" and not parent.is_desktop_window:
                 parent.close()
 
 
     def open(self, event=None, spring_open=False):
-        print(f"Asked to open {self.path}")
-        self.hover_timer.stop()
+        debug_print(f"Asked to open {self.path}")
+        self.stop_spring_open_timer()
         self.unhighlight()
-        self.path = os.path.realpath(self.path)
-
-        if not os.path.exists(self.path):
-            QMessageBox.critical(self, "Error", "%s does not exist." % self.path)
+        # Resolving symbolic links can be slow, e.g., on Windows, and spring-loading may open the same item again and again,
+        # so the resolved path is reused for a few seconds; self.path stays as it is because the window looks items up by it
+        now = time.monotonic()
+        if self.real_path is None or now - self.real_path_time > 2:
+            self.real_path = os.path.realpath(self.path)
+            self.real_path_time = now
+        path = self.real_path
+
+        if not os.path.exists(path):
+            QMessageBox.critical(self, "Error", "%s does not exist." % path)
             return
         
-        if appdir.is_appdir(self.path):
-            A = appdir.AppDir(self.path)
+        if appdir.is_appdir(path):
+            A = appdir.AppDir(path)
             apprun_path = A.get_apprun_path()
             if apprun_path.endswith(".bat"):
                 # TODO: Find a way to run bat files without opening a window
-                os.startfile(A.get_apprun_path())
+                os.startfile(apprun_path)
             else:
-                os.startfile(A.get_apprun_path())
+                os.startfile(apprun_path)
             return
 
         if self.is_directory:
-            existing_window = app.open_windows.get(self.path)
+            existing_window = app.open_windows.get(path)
             if existing_window:
                 existing_window.raise_()
                 existing_window.highlightWindow()
             else:
-                new_window = SpatialFiler(self.path)
+                new_window = SpatialFiler(path)
                 if spring_open == True:
                     new_window.is_spring_opened = True
                 new_window.show()
-                app.open_windows[self.path] = new_window
+                app.open_windows[path] = new_window
         else:
             if sys.platform == "win32":
-                if self.path.endswith(".AppImage"):
+                if path.endswith(".AppImage"):
                     try:
                         # Run wsl and pass in the Linux path to the AppImage; tested on Windows 11
-                        drive_letter = self.path[0]
-                        linux_path = self.path.replace("\\", "/")
+                        drive_letter = path[0]
+                        linux_path = path.replace("\\", "/")
                         linux_path = linux_path.replace(drive_letter + ":", "/mnt/" + drive_letter.lower())
                         linux_path = linux_path.replace("(", "").replace(")", "")
                         print(f"Launching AppImage with WSL: {linux_path}")
@@ -1213,37 +1731,43 @@ class Item(QWidget):
                         print(f"Error opening AppImage: {e}")
                 else:
                     try:
-                        os.startfile(self.path)
+                        os.startfile(path)
                     except Exception as e:
                         print(f"Error opening file: {e}")
             else:
-                os.system(f"xdg-open \"{self.path}\"")
+                # Passing the path as an argument needs no shell and no quoting, and does not wait for xdg-open to finish
+                try:
+                    subprocess.Popen(["xdg-open", path])
+                except Exception as e:
+                    print(f"Error opening file: {e}")
 
     def dragEnterEvent(self, event):
-        print("dragEnterEvent called")
+        debug_print("dragEnterEvent called")
         if event.mimeData().hasUrls():
             urls = event.mimeData().urls()
-            print("Dragging over this item:", [url.toLocalFile() for url in urls])
+            debug_print("Dragging over this item:", [url.toLocalFile() for url in urls])
             self.highlight()
             # Spring-loaded folders
             if self.is_directory == True and appdir.is_appdir(self.path) == False:
-                print("Starting hover timer")
-                self.hover_timer.start(1500)
+                debug_print("Starting hover timer")
+                window = self.window()
+                if isinstance(window, SpatialFiler):
+                    window.start_spring_open_timer(self)
             event.accept()
         else:
             event.ignore()
 
     def dragLeaveEvent(self, event):
-        print("No longer dragging over this item")
-        self.hover_timer.stop()
+        debug_print("No longer dragging over this item")
+        self.stop_spring_open_timer()
         self.unhighlight()
 
     def dropEvent(self, event):
-        print("dropEvent called")
-        self.hover_timer.stop()
+        debug_print("dropEvent called")
+        self.stop_spring_open_timer()
         if event.mimeData().hasUrls():
             urls = event.mimeData().urls()
-            print("Dropped onto this item:", [url.toLocalFile() for url in urls])
+            debug_print("Dropped onto this item:", [url.toLocalFile() for url in urls])
             event.ignore() # Do not move the item in the window
             # TODO: If this item is an application, then launch this item with the dropped items as arguments;
             if self.is_directory:
@@ -1255,7 +1779,7 @@ class Item(QWidget):
                     return
                 try:
                     menu = QMenu()
-                    if self.path != os.path.normpath(get_desktop_directory() + "/" + app.trash_name):
+                    if self.path != app.trash_path:
                         move_action = menu.addAction("Move")
                         copy_action = menu.addAction("Copy")
                         link_action = menu.addAction("Link")
@@ -1286,12 +1810,25 @@ class Item(QWidget):
         else:
             event.ignore()  # Ignore the event if it's not valid
 
+# Icons of files are cached by type, except for files with these extensions, which can each have an icon of their own
+PER_FILE_ICON_EXTENSIONS = frozenset({".exe", ".lnk", ".ico", ".url", ".cur", ".ani"})
+
+# Creating the WScript.Shell COM object is expensive, so it is created only once
+_wscript_shell = None
+
+def get_wscript_shell():
+    """Get the shared WScript.Shell COM object, creating it on first use."""
+    global _wscript_shell
+    if _wscript_shell is None:
+        from win32com.client import Dispatch
+        _wscript_shell = Dispatch("WScript.Shell")
+    return _wscript_shell
+
 def get_desktop_directory():
     """Get the desktop directory of the user."""
     if sys.platform == "win32":
-        from win32com.client import Dispatch
-        shell = Dispatch("WScript.Shell")
-        desktop = os.path.normpath(shell.SpecialFolders("Desktop"))
+        shell = get_wscript_shell()
+        desktop = shell.SpecialFolders("Desktop")
     else:
         desktop = QDir.homePath() + "/Desktop"
     return os.path.normpath(desktop)
@@ -1304,9 +1841,24 @@ if __name__ == "__main__":
     app.open_windows = {}
     app.desktop_settings_file = ".DS_Spatial"
     app.trash_name = "Trash"
+    # Paths that windows and items compare against, normalized only once
+    app.desktop_directory = get_desktop_directory()
+    app.root_path = os.path.normpath(QDir.rootPath())
+    app.trash_path = os.path.normpath(app.desktop_directory + "/" + app.trash_name)
     app.icon_size = 32
-    app.icon = QFileIconProvider().icon(QFileIconProvider.IconType.Folder)
+    # One icon provider is shared by all windows and items
+    app.icon_provider = QFileIconProvider()
+    app.mime_database = QMimeDatabase()
+    app.icon = app.icon_provider.icon(QFileIconProvider.IconType.Folder)
     app.to_cut = False
+    # Fonts and font metrics are the same for all items, so they are created only once
+    app.font_metrics = QFontMetrics(app.font())
+    app.item_font = QFont()
+    app.item_font.setPointSize(8)
+    # The names of the items are elided and measured in the font that their labels use
+    app.item_font_metrics = QFontMetrics(app.item_font)
+    # Height of a line of items, the same for all windows
+    app.line_height = app.icon_size + app.font_metrics.height() + 16
 
     # Output not only to the console but also to the GUI
     try:
@@ -1318,9 +1870,21 @@ if __name__ == "__main__":
         sys.stdout = log_console.Tee(sys.stdout, app.log_console)
         sys.stderr = log_console.Tee(sys.stderr, app.log_console)
 
+    # On Windows, the wallpaper is read and decoded only once, and scaled only once for each screen size
+    windows_wallpaper = None
+    scaled_windows_wallpapers = {}
+    if sys.platform == "win32":
+        shell = get_wscript_shell()
+        windows_wallpaper_path = os.path.normpath(shell.RegRead("HKEY_CURRENT_USER\\Control Panel\\Desktop\\Wallpaper")).replace("\\", "/")
+        print("Windows wallpaper path:", windows_wallpaper_path)
+        if windows_wallpaper_path != "." and os.path.exists(windows_wallpaper_path):
+            windows_wallpaper = QPixmap(windows_wallpaper_path)
+        else:
+            print("No wallpaper found")
+
     for screen in QApplication.screens():
         # TODO: Possibly only create the desktop window on the primary screen and just show a background image on the other screens
-        desktop = SpatialFiler(get_desktop_directory(), is_desktop_window = True)
+        desktop = SpatialFiler(app.desktop_directory, is_desktop_window = True)
         desktop.move(screen.geometry().x(), screen.geometry().y())
         desktop.resize(screen.geometry().width(), screen.geometry().height())
         desktop.setWindowFlags(Qt.WindowType.FramelessWindowHint)
@@ -1334,18 +1898,18 @@ if __name__ == "__main__":
 
         desktop.setWindowFlag(Qt.WindowType.WindowStaysOnBottomHint)
 
-        # On Windows, get the wallpaper and set it as the background of the window
-        if sys.platform == "win32":
-            shell = Dispatch("WScript.Shell")
-            windows_wallpaper_path = os.path.normpath(shell.RegRead("HKEY_CURRENT_USER\\Control Panel\\Desktop\\Wallpaper")).replace("\\", "/")
-            print("Windows wallpaper path:", windows_wallpaper_path)
-            if windows_wallpaper_path != "." and os.path.exists(windows_wallpaper_path):
-                p = desktop.container.palette()
-                p.setBrush(desktop.container.backgroundRole(), QBrush(QPixmap(windows_wallpaper_path).scaled(desktop.width(), desktop.height(), Qt.AspectRatioMode.KeepAspectRatioByExpanding, Qt.TransformationMode.SmoothTransformation)))
-                desktop.container.setPalette(p)
-            else:
-                print("No wallpaper found")
+        # On Windows, set the wallpaper as the background of the window
+        if windows_wallpaper is not None:
+            size = (desktop.width(), desktop.height())
+            if size not in scaled_windows_wallpapers:
+                scaled_windows_wallpapers[size] = windows_wallpaper.scaled(desktop.width(), desktop.height(), Qt.AspectRatioMode.KeepAspectRatioByExpanding, Qt.TransformationMode.SmoothTransformation)
+            p = desktop.container.palette()
+            p.setBrush(desktop.container.backgroundRole(), QBrush(scaled_windows_wallpapers[size]))
+            desktop.container.setPalette(p)
 
         desktop.show()
 
-    sys.exit(app.exec())
+    exit_code = app.exec()
+    # Let settings files that are still being written in the background be completed
+    QThreadPool.globalInstance().waitForDone()
+    sys.exit(exit_code)